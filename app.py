@@ -130,7 +130,7 @@ if st.session_state.page == 'home':
     # Tech stack footer
     st.markdown("---")
     st.markdown("### 🔧 Tech Stack")
-    st.markdown("**Sentence-BERT** • **FAISS** • **Groq Llama 3.3** • **PyPDF2**")
+    st.markdown("**Sentence-BERT** • **FAISS** • **Groq Llama 3.3** • **PyMuPDF**")
 
 
 # POLICY ASSISTANT PAGE
@@ -338,7 +338,10 @@ elif st.session_state.page == 'recruitment':
             with col2:
                 st.metric("Shortlisted", len(df[df['shortlisted']]))
             with col3:
-                st.metric("Average Score", f"{df['final_score'].mean():.1f}")
+                # Candidates skipped by screening have no final score, so
+                # only average the real ones
+                scores = df['final_score'].dropna()
+                st.metric("Average Score", f"{scores.mean():.1f}" if len(scores) else "—")
             
             # Bar chart showing scores (green = shortlisted, red = not shortlisted)
             fig = go.Figure(data=[go.Bar(
@@ -15,12 +15,9 @@ Tech stack: Sentence-BERT for understanding, FAISS for fast search, Groq for ans
 
 import os
 from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-import faiss
-import numpy as np
 from groq import Groq
 from dotenv import load_dotenv
-from modules.utils import extract_text_from_pdf
+from modules.utils import chunk_id, chunk_text, extract_texts_from_pdfs, get_embedding_model
 
 load_dotenv()
 
@@ -47,7 +44,7 @@ class PolicyChatbot:
         
         # Load the AI model
         print("🔄 Loading Sentence-BERT (the brain that understands your questions)...")
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = get_embedding_model()
         print("✅ Ready to understand your questions!")
         
         # Set up the AI that generates natural language answers
@@ -69,7 +66,8 @@ class PolicyChatbot:
         print("✅ AI assistant ready to answer questions!")
     
     
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50,
+                   adaptive: bool = False) -> List[str]:
         """
         Break long documents into chunks that the AI can work with.
 
@@ -77,21 +75,12 @@ class PolicyChatbot:
             text: The full document text
             chunk_size: How many words per chunk
             overlap: How many words to repeat between chunks
+            adaptive: Avoid a tiny leftover chunk at the end (see utils.chunk_text)
         
         Returns:
             List of text chunks, like pages in a book
         """
-        words = text.split()
-        chunks = []
-        
-        # Slide through the text with overlapping windows
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():  # Don't keep empty chunks
-                chunks.append(chunk)
-        
-        # If document is tiny, just return it as-is
-        return chunks if chunks else [text]
+        return chunk_text(text, chunk_size, overlap, adaptive=adaptive)
     
     
     def load_policies(self) -> bool:
@@ -115,13 +104,13 @@ class PolicyChatbot:
             print("❌ No policy files found! Add some PDFs to the policies folder.")
             return False
         
-        # Read each PDF and extract the text
-        for filename in policy_files:
-            filepath = os.path.join(self.data_dir, filename)
-            print(f"📖 Reading {filename}...")
-            
-            # PyPDF2 extracts the actual text from the PDF
-            text = extract_text_from_pdf(filepath)
+        # Read all the PDFs (in parallel) and extract the text
+        print(f"📖 Reading {len(policy_files)} PDF files...")
+        filepaths = [os.path.join(self.data_dir, filename) for filename in policy_files]
+        texts = extract_texts_from_pdfs(filepaths)
+        
+        for filename, filepath in zip(policy_files, filepaths):
+            text = texts[filepath]
             
             if text.strip():
                 print(f"✅ Got {len(text)} characters from {filename}")
@@ -154,6 +143,12 @@ class PolicyChatbot:
         all_chunks = []
         chunk_metadata = []
         
+        # Identical chunks (shared headers, boilerplate) only need embedding once:
+        # unique_rows maps each chunk's hash to its row in unique_chunks
+        unique_chunks = []
+        unique_rows = {}
+        chunk_rows = []
+        
         # Break each document into chunks
         for doc in self.documents:
             print(f"📝 Breaking {doc['source']} into chunks...")
@@ -165,6 +160,12 @@ class PolicyChatbot:
             
             # Keep track of which chunk came from which document
             for i, chunk in enumerate(chunks):
+                chunk_hash = chunk_id(chunk)
+                if chunk_hash not in unique_rows:
+                    unique_rows[chunk_hash] = len(unique_chunks)
+                    unique_chunks.append(chunk)
+                chunk_rows.append(unique_rows[chunk_hash])
+                
                 all_chunks.append(chunk)
                 chunk_metadata.append({
                     'source': doc['source'],
@@ -178,14 +179,18 @@ class PolicyChatbot:
             return False
         
         # "semantic embedding" - similar meanings = similar numbers
-        print(f"🧠 Converting {len(all_chunks)} chunks into AI-understandable format...")
-        embeddings = self.model.encode(
-            all_chunks, 
+        print(f"🧠 Converting {len(unique_chunks)} unique chunks into AI-understandable format...")
+        unique_embeddings = self.model.encode(
+            unique_chunks, 
             convert_to_tensor=False, 
             show_progress_bar=True
         )
+        # Every chunk still gets its own vector, so search results keep their source
+        embeddings = unique_embeddings[chunk_rows]
         
         # Build a FAISS index for super-fast similarity search
+        # (imported here so just importing this module stays quick)
+        import faiss
         print("🔍 Creating search index...")
         dimension = embeddings.shape[1]
         self.index = faiss.IndexFlatL2(dimension)  # L2 = Euclidean distance
@@ -245,8 +250,8 @@ class PolicyChatbot:
         
         print(f"✅ Found {len(results)} relevant sections")
         
-        # Show which documents were helpful
-        unique_sources = list(set(r['source'] for r in results))
+        # Show which documents were helpful (most relevant first)
+        unique_sources = list(dict.fromkeys(r['source'] for r in results))
         print(f"📚 Information from: {', '.join(unique_sources)}")
         
         return results
@@ -286,7 +291,7 @@ class PolicyChatbot:
         ])
         
         # Keep track of which files we're citing
-        sources = list(set(chunk['source'] for chunk in retrieved_chunks))
+        sources = list(dict.fromkeys(chunk['source'] for chunk in retrieved_chunks))
         
         # Step 3: Ask the AI to answer based on the context
         prompt = f"""You are a helpful HR assistant. Answer the employee's question using ONLY the policy documents provided below.
@@ -9,10 +9,9 @@ This module handles two main jobs:
 import os
 import json
 from typing import List, Dict
-from sentence_transformers import SentenceTransformer, util
-from groq import Groq
 from dotenv import load_dotenv
-from modules.resume_parser import ResumeParser
+from modules.resume_parser import ResumeParser, get_raw_text
+from modules.utils import get_embedding_model
 
 load_dotenv()
 
@@ -46,22 +45,19 @@ class RecruitmentEngine:
         # This lets us compare "how similar" a resume is to a JD, not just keyword matching
         print("🧠 Loading Sentence-BERT (the brain that compares resumes to job descriptions)...")
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = get_embedding_model()
             print("✅ Sentence-BERT ready!")
         except Exception as e:
             print(f"❌ Couldn't load Sentence-BERT: {e}")
             raise
         
-        # Set up Groq for generating interview questions
-        print("🤖 Connecting to Groq AI...")
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            print("❌ Can't find GROQ_API_KEY in environment!")
+        # Groq for generating interview questions - reuse the parser's client
+        # rather than looking up the API key and connecting a second time
+        self.client = self.parser.client
+        if self.client is None:
+            print("❌ Can't find GROQ_API_KEY in environment or Streamlit secrets!")
             raise ValueError("Missing GROQ_API_KEY - add it to your .env file")
         
-        self.client = Groq(api_key=api_key)
-        print("✅ Groq AI connected!")
-        
         print("✅ Recruitment Engine ready to screen candidates!\n")
     
     
@@ -71,11 +67,17 @@ class RecruitmentEngine:
         
         This is the core screening logic. For each resume, we:
         1. Extract skills using AI (not just keyword matching)
-        2. Calculate semantic similarity (does their experience fit?)
-        3. Check skill matches (do they have what we need?)
+        2. Check skill matches (do they have what we need?)
+        3. Calculate semantic similarity (does their experience fit?)
         4. Combine scores with a weighted formula (60% experience, 40% skills)
         5. Decide if they're shortlisted based on threshold
         
+        Semantic similarity is the expensive step, so it's skipped for candidates
+        whose skill match is too low to reach the threshold even with a perfect
+        semantic score. Those come back with similarity_score=None and
+        final_score=None, are never shortlisted, and are listed after everyone
+        who got a real score.
+        
         Why 60/40 weighting? Overall experience and fit matters more than just
         having every checkbox skill. Someone with 5/7 skills but great experience
         often beats someone with 7/7 skills but poor fit.
@@ -86,13 +88,15 @@ class RecruitmentEngine:
             threshold: Minimum score to be shortlisted (default 50%)
         
         Returns:
-            List of candidate results, sorted by score (highest first)
+            List of candidate results, sorted by score (highest first, unscored last)
         """
         
         def log(msg):
             """Helper to print screening progress"""
             print(msg)
         
+        from sentence_transformers import util
+        
         log(f"\n{'='*60}")
         log(f"🎯 SCREENING {len(resume_paths)} CANDIDATES")
         log(f"{'='*60}")
@@ -115,62 +119,106 @@ class RecruitmentEngine:
         jd_embedding = self.model.encode(job_description, convert_to_tensor=True)
         log(f"✅ Job profile created (vector dimension: {jd_embedding.shape})")
         
-        # STEP 3: Process each resume
-        for i, resume_path in enumerate(resume_paths, 1):
+        # STEP 3: Parse all resumes (in parallel - it's mostly waiting on the AI)
+        log(f"\n📖 STEP 3: Reading and parsing {len(resume_paths)} resumes...")
+        parsed_resumes = self.parser.parse_batch(resume_paths, keep_raw_text=True)
+        
+        candidates = []
+        for i, (resume_path, candidate_data) in enumerate(zip(resume_paths, parsed_resumes), 1):
             log(f"\n{'='*60}")
-            log(f"📄 PROCESSING RESUME {i}/{len(resume_paths)}: {os.path.basename(resume_path)}")
+            log(f"📄 RESUME {i}/{len(resume_paths)}: {os.path.basename(resume_path)}")
             log(f"{'='*60}")
             
-            try:
-                # Parse the resume PDF and extract information
-                log(f"📖 Reading and parsing resume...")
-                candidate_data = self.parser.parse(resume_path)
-                
-                if not candidate_data:
-                    log(f"❌ Couldn't extract info from this resume - skipping")
+            if not candidate_data:
+                log(f"❌ Couldn't extract info from this resume - skipping")
+                continue
+            
+            log(f"✅ Candidate: {candidate_data['name']}")
+            log(f"✅ Contact: {candidate_data['email']}")
+            log(f"✅ Their skills: {candidate_data['skills']}")
+            
+            candidates.append(candidate_data)
+        
+        # STEP 4: Check which specific skills each candidate has
+        # This is more black-and-white: do they have the tech stack we need?
+        required_count = len(required_skills)
+        skill_matches = []
+        for candidate_data in candidates:
+            matched_skills = [
+                skill for skill in required_skills 
+                if skill in candidate_data['skills']
+            ]
+            
+            # Calculate skill match percentage
+            if required_count > 0:
+                skill_match_rate = round((len(matched_skills) / required_count) * 100, 2)
+            else:
+                skill_match_rate = 0  # No required skills = can't calculate
+            
+            skill_matches.append((matched_skills, skill_match_rate))
+        
+        # Semantic similarity is at most 100%, so the best possible final score is
+        # 60 + (skills × 0.4). Anyone below the threshold even then can't be
+        # shortlisted, so we skip embedding them. This never drops a candidate who
+        # would otherwise have been shortlisted.
+        needs_semantic = [
+            (skill_match_rate * 0.4) + 60 >= threshold
+            for _, skill_match_rate in skill_matches
+        ]
+        skipped = needs_semantic.count(False)
+        if skipped:
+            log(f"\n⏭️ Skipping semantic matching for {skipped} candidate(s) that can't reach the threshold")
+        
+        # STEP 5: Convert resumes into semantic embeddings (same format as JD)
+        # The same resume often gets uploaded twice (e.g. from two sources), so we
+        # only encode each distinct text once and map the results back
+        similarity_scores = [None] * len(candidates)
+        if any(needs_semantic):
+            log(f"\n🧠 STEP 5: Creating semantic profiles of {len(candidates) - skipped} candidates...")
+            unique = {}
+            idx_map = {}
+            for i, candidate_data in enumerate(candidates):
+                if not needs_semantic[i]:
                     continue
-                
-                log(f"✅ Candidate: {candidate_data['name']}")
-                log(f"✅ Contact: {candidate_data['email']}")
-                log(f"✅ Their skills: {candidate_data['skills']}")
-                
-                # Convert resume into semantic embedding (same format as JD)
-                log(f"\n🧠 Creating semantic profile of candidate...")
                 # Use first 2000 chars to avoid token limits
-                resume_text = candidate_data['raw_text'][:2000]
-                resume_embedding = self.model.encode(resume_text, convert_to_tensor=True)
-                log(f"✅ Candidate profile created")
-                
-                # Calculate how similar the resume is to the JD (semantic match)
-                # This captures overall fit: does their experience align with the role?
-                log(f"\n📊 Measuring how well they match the role overall...")
-                similarity = util.cos_sim(resume_embedding, jd_embedding).item()
-                similarity_score = round(similarity * 100, 2)
+                resume_text = get_raw_text(candidate_data)[:2000]
+                if resume_text not in unique:
+                    unique[resume_text] = len(unique)
+                idx_map[i] = unique[resume_text]
+            
+            resume_embeddings = self.model.encode(list(unique), convert_to_tensor=True)
+            log(f"✅ {len(unique)} unique candidate profiles created")
+            
+            # Calculate how similar each resume is to the JD (semantic match)
+            # This captures overall fit: does their experience align with the role?
+            similarities = util.cos_sim(resume_embeddings, jd_embedding)[:, 0].tolist()
+            for i, j in idx_map.items():
+                similarity_scores[i] = round(similarities[j] * 100, 2)
+        
+        # STEP 6: Score each candidate
+        for candidate_data, similarity_score, (matched_skills, skill_match_rate) in zip(
+            candidates, similarity_scores, skill_matches
+        ):
+            matched_count = len(matched_skills)
+            
+            log(f"\n{'='*60}")
+            log(f"📊 SCORING: {candidate_data['name']} ({candidate_data['filename']})")
+            log(f"{'='*60}")
+            log(f"   Required skills: {required_skills}")
+            log(f"   Candidate has: {candidate_data['skills']}")
+            log(f"   Matched: {matched_skills}")
+            log(f"✅ Skill match rate: {matched_count}/{required_count} = {skill_match_rate}%")
+            
+            if similarity_score is None:
+                # Semantic step was skipped, so there's no real final score
+                final_score = None
+                shortlisted = False
+                log(f"   Semantic similarity skipped (can't reach {threshold}% threshold)")
+                log(f"   ❌ NOT SHORTLISTED (threshold: {threshold}%)")
+            else:
                 log(f"✅ Semantic similarity: {similarity_score}%")
                 log(f"   (This measures overall experience fit, not just keywords)")
                 
-                # Check which specific skills they have
-                # This is more black-and-white: do they have the tech stack we need?
-                log(f"\n🔍 Checking specific skill matches...")
-                matched_skills = [
-                    skill for skill in required_skills 
-                    if skill in candidate_data['skills']
-                ]
-                matched_count = len(matched_skills)
-                required_count = len(required_skills)
-                
-                log(f"   Required skills: {required_skills}")
-                log(f"   Candidate has: {candidate_data['skills']}")
-                log(f"   Matched: {matched_skills}")
-                
-                # Calculate skill match percentage
-                if required_count > 0:
-                    skill_match_rate = round((matched_count / required_count) * 100, 2)
-                else:
-                    skill_match_rate = 0  # No required skills = can't calculate
-                
-                log(f"✅ Skill match rate: {matched_count}/{required_count} = {skill_match_rate}%")
-                
                 # Calculate final score using weighted formula
                 # 60% semantic (overall fit) + 40% skills (specific requirements)
                 log(f"\n🎯 Calculating final score...")
@@ -182,33 +230,30 @@ class RecruitmentEngine:
                 shortlisted = final_score >= threshold
                 status = '✅ SHORTLISTED' if shortlisted else '❌ NOT SHORTLISTED'
                 log(f"   {status} (threshold: {threshold}%)")
-                
-                # Package up all the info for this candidate
-                result = {
-                    'name': candidate_data['name'],
-                    'email': candidate_data['email'],
-                    'phone': candidate_data['phone'],
-                    'experience_years': candidate_data['experience_years'],
-                    'similarity_score': similarity_score,
-                    'skill_match_rate': skill_match_rate,
-                    'matched_skills': matched_skills,
-                    'matched_skills_count': matched_count,
-                    'required_skills_count': required_count,
-                    'final_score': final_score,
-                    'shortlisted': shortlisted,
-                    'raw_text': candidate_data['raw_text']
-                }
-                
-                results.append(result)
-                
-            except Exception as e:
-                log(f"\n❌ ERROR processing this resume: {str(e)}")
-                import traceback
-                log(traceback.format_exc())
-                continue
+            
+            # Package up all the info for this candidate
+            result = {
+                'name': candidate_data['name'],
+                'email': candidate_data['email'],
+                'phone': candidate_data['phone'],
+                'experience_years': candidate_data['experience_years'],
+                'similarity_score': similarity_score,
+                'skill_match_rate': skill_match_rate,
+                'matched_skills': matched_skills,
+                'matched_skills_count': matched_count,
+                'required_skills_count': required_count,
+                'final_score': final_score,
+                'shortlisted': shortlisted,
+                'raw_text': candidate_data['raw_text']  # Compressed, see get_raw_text
+            }
+            
+            results.append(result)
         
-        # Sort candidates by score (best first)
-        results.sort(key=lambda x: x['final_score'], reverse=True)
+        # Sort candidates by score (best first, skipped candidates at the end)
+        results.sort(
+            key=lambda x: (x['final_score'] is not None, x['final_score'] or 0),
+            reverse=True
+        )
         
         log(f"\n{'='*60}")
         log(f"✅ SCREENING COMPLETE!")
@@ -279,17 +324,19 @@ Create questions that are:
 For each question, also provide "evaluation keywords" - the key concepts or techniques
 you'd expect in a good answer.
 
-OUTPUT FORMAT (return ONLY valid JSON, no markdown, no explanation):
-[
-  {{
-    "question": "How would you handle database connection pooling in a high-traffic application?",
-    "keywords": ["connection pool", "resource management", "concurrent connections", "timeouts"]
-  }},
-  {{
-    "question": "Describe your approach to debugging a memory leak in production.",
-    "keywords": ["profiling", "heap dump", "monitoring", "gradual degradation", "logs"]
-  }}
-]
+OUTPUT FORMAT (return ONLY a valid JSON object, no markdown, no explanation):
+{{
+  "questions": [
+    {{
+      "question": "How would you handle database connection pooling in a high-traffic application?",
+      "keywords": ["connection pool", "resource management", "concurrent connections", "timeouts"]
+    }},
+    {{
+      "question": "Describe your approach to debugging a memory leak in production.",
+      "keywords": ["profiling", "heap dump", "monitoring", "gradual degradation", "logs"]
+    }}
+  ]
+}}
 
 Now generate {num_questions} questions in this exact JSON format:"""
         
@@ -299,21 +346,15 @@ Now generate {num_questions} questions in this exact JSON format:"""
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,  # Some creativity, but not too wild
-                max_tokens=1500
+                max_tokens=1350,
+                response_format={"type": "json_object"}  # Guaranteed JSON, no markdown
             )
             
             result = response.choices[0].message.content.strip()
             
-            # Clean up the response (sometimes AI wraps JSON in markdown)
-            if '```json' in result:
-                result = result.split('```json')[1].split('```')[0]
-            elif '```' in result:
-                result = result.split('```')[1].split('```')[0]
-            
-            result = result.strip()
-            
             # Parse the JSON
-            questions = json.loads(result)
+            data = json.loads(result)
+            questions = data.get('questions') if isinstance(data, dict) else data
             
             # Validate that we got a proper list
             if isinstance(questions, list):
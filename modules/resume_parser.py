@@ -5,7 +5,7 @@ Resumes come in every format imaginable. This parser handles the chaos by using
 a combination of techniques:
 - spaCy NER (finds names, organizations, etc.)
 - Regex patterns (emails, phones, experience mentions)
-- AI/LLM (skill extraction, name detection as fallback)
+- AI/LLM (name, skills, education and experience in a single call)
 
 The goal: Turn a PDF into structured data we can actually work with.
 """
@@ -13,13 +13,170 @@ The goal: Turn a PDF into structured data we can actually work with.
 import re
 import os
 import json
+import time
+import zlib
+import shelve
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Optional
 from groq import Groq
 from dotenv import load_dotenv
-from modules.utils import extract_text_from_pdf
+from modules.utils import (
+    clear_pdf_text_cache,
+    ensure_directory,
+    extract_text_from_pdf,
+    extract_texts_from_pdfs,
+    get_embedding_model,
+)
 
 load_dotenv()
 
+# orjson (Rust) parses the AI's JSON answers and reads/writes our cache files
+# several times faster than the standard library. Its JSONDecodeError subclasses
+# json.JSONDecodeError, so the error handling below works with either.
+# Both loads functions accept bytes; _json_dumps always returns UTF-8 bytes.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+# If google-re2 is installed (pip install google-re2) we use it for the resume
+# patterns: it matches in linear time with no backtracking, which adds up when
+# scanning hundreds of resumes. The patterns work the same with plain `re`.
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Regex patterns are compiled once here instead of on every call
+_EMAIL_RE = _regex.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_FOUR_DIGITS_RE = _regex.compile(r'(?:\D*\d){4}')  # "has more than 3 digits", in one C-level match
+_PHONE_RES = [
+    _regex.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),  # US format
+    _regex.compile(r'\+\d{10,15}'),  # International format
+]
+_EXPERIENCE_RES = [
+    _regex.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'),
+    _regex.compile(r'(\d+)\+?\s*years?\s+in'),
+]
+# Sentence boundaries: end punctuation, or a line break (resume lines often
+# don't end with a full stop)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+# Any of the education keywords, checked in one pass per sentence
+_EDUCATION_RE = re.compile(r'bachelor|master|phd|degree|university', re.IGNORECASE)
+
+# Groq models: simple list/name extraction goes to the small, fast model; the
+# 70B model is kept for the combined extraction in parse_with_llm
+FAST_MODEL = "llama-3.1-8b-instant"
+SMART_MODEL = "llama-3.3-70b-versatile"
+
+# Bump this whenever a prompt changes so old cached answers are ignored
+PROMPT_VERSION = "v3"
+
+# Shared system message for the JSON extraction calls. Groq caches prompt
+# prefixes, so every prompt puts its fixed instructions first and the
+# resume/JD text last - the instructions are then a cache hit on every call.
+EXTRACTION_SYSTEM_PROMPT = (
+    "You extract structured information from resumes and job descriptions. "
+    "Reply with ONLY valid JSON - no markdown, no explanation."
+)
+
+# Parsed LLM answers are cached on disk (and in memory) so re-uploading the same
+# resume or JD doesn't cost another Groq round-trip
+LLM_CACHE_PATH = os.path.expanduser("~/.cache/smarthr/llm.db")
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # 7 days
+_llm_cache = {}
+_llm_cache_lock = threading.Lock()  # shelve isn't safe for concurrent writers
+
+# How many resumes parse_batch keeps in flight at once (Groq rate limits)
+MAX_PARALLEL_PARSES = 10
+
+# JDs for the same role get re-posted with small wording changes, which the exact
+# cache misses. So JD skills are also cached by meaning: if a new JD's embedding
+# is at least this similar to a cached one, we reuse its skills.
+JD_CACHE_INDEX_PATH = os.path.expanduser("~/.cache/smarthr/jd_skills.faiss")
+JD_CACHE_SKILLS_PATH = os.path.expanduser("~/.cache/smarthr/jd_skills.json")
+JD_SEMANTIC_THRESHOLD = 0.92
+# Saved with the cache: skill lists from another prompt version or model are dropped
+JD_CACHE_VERSION = f"{PROMPT_VERSION}|{FAST_MODEL}"
+_jd_cache = None  # {'index': FAISS index, 'skills': [...]}, loaded on first use
+
+
+# zstd-compressed data always starts with these bytes, which tells us which
+# decompressor to use (zlib is the fallback when zstandard isn't installed)
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _compress_text(text: str) -> bytes:
+    """Compress resume text for storage (zstandard if available, else zlib)."""
+    data = text.encode('utf-8')
+    try:
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    except ImportError:
+        return zlib.compress(data)
+
+
+def get_raw_text(parsed: Dict) -> str:
+    """
+    Get the full resume text back from a parsed resume.
+    
+    Args:
+        parsed: Output of ResumeParser.parse(..., keep_raw_text=True)
+    
+    Returns:
+        The resume text (empty string if it wasn't kept)
+    """
+    raw = parsed.get('raw_text')
+    if not raw:
+        return ""
+    if isinstance(raw, str):
+        return raw
+    if raw.startswith(_ZSTD_MAGIC):
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(raw).decode('utf-8')
+    return zlib.decompress(raw).decode('utf-8')
+
+
+_nlp_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _load_nlp():
+    """Load the spaCy English model once (None if spaCy or the model is missing)."""
+    # Only NER (names) is used, so the parser, tagger and lemmatizer are
+    # switched off - faster to load and run
+    print("🔄 Loading spaCy (for finding names and entities)...")
+    try:
+        import spacy
+        nlp = spacy.load(
+            "en_core_web_sm",
+            disable=["parser", "tagger", "lemmatizer", "attribute_ruler"]
+        )
+        print("✅ spaCy ready!")
+        return nlp
+    except Exception:
+        print("⚠️ spaCy not available (name extraction will be less accurate)")
+        return None
+
+
+def _get_nlp():
+    """
+    Get the shared spaCy pipeline, loading it on first use.
+    
+    It's shared by every ResumeParser in the process, so creating a new parser
+    (e.g. on a Streamlit rerun) doesn't load the model again.
+    """
+    with _nlp_lock:  # parse_batch may ask from several threads at once
+        return _load_nlp()
+
 
 class ResumeParser:
     """
@@ -57,16 +214,8 @@ class ResumeParser:
             except:
                 pass
         
-        # Load spaCy for Named Entity Recognition
-        # This helps us find names, dates, organizations, etc.
-        print("🔄 Loading spaCy (for finding names and entities)...")
-        try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
-            print("✅ spaCy ready!")
-        except:
-            print("⚠️ spaCy not available (name extraction will be less accurate)")
-            self.nlp = None
+        # spaCy (for names and entities) is loaded the first time it's needed,
+        # see the `nlp` property
         
         # Set up Groq for AI-powered skill extraction
         if api_key:
@@ -79,11 +228,157 @@ class ResumeParser:
         print("✅ Resume Parser ready to process PDFs!")
     
     
+    @property
+    def nlp(self):
+        """spaCy pipeline for finding names (None if spaCy isn't installed)."""
+        return _get_nlp()
+    
+    
+    def _llm_cache_key(self, model: str, prompt: str) -> str:
+        """Build the cache key for an LLM call (same model + prompt = same answer)."""
+        return hashlib.sha256(f"{model}|{PROMPT_VERSION}|{prompt}".encode('utf-8')).hexdigest()
+    
+    
+    def _llm_cache_get(self, key: str):
+        """
+        Look up a cached LLM answer, in memory first and then on disk.
+        
+        Returns:
+            The cached (already parsed) answer, or None on a miss or expired entry
+        """
+        entry = _llm_cache.get(key)
+        if entry is None:
+            try:
+                with _llm_cache_lock, shelve.open(LLM_CACHE_PATH) as db:
+                    entry = db.get(key)
+            except Exception:
+                entry = None  # No cache file yet, or it's unreadable
+        
+        if entry is None or entry['expiresAt'] < time.time():
+            return None
+        
+        _llm_cache[key] = entry
+        return entry['value']
+    
+    
+    def _llm_cache_put(self, key: str, value) -> None:
+        """Store a parsed LLM answer in memory and on disk."""
+        entry = {'value': value, 'expiresAt': time.time() + LLM_CACHE_TTL}
+        _llm_cache[key] = entry
+        try:
+            ensure_directory(os.path.dirname(LLM_CACHE_PATH))
+            with _llm_cache_lock, shelve.open(LLM_CACHE_PATH) as db:
+                db[key] = entry
+        except Exception as e:
+            print(f"⚠️ Couldn't save to LLM cache: {e}")
+    
+    
+    def _log_token_usage(self, response) -> None:
+        """Print how many prompt tokens Groq served from its own prompt cache."""
+        x_groq_usage = getattr(getattr(response, 'x_groq', None), 'usage', None)
+        usage = getattr(response, 'usage', None) or x_groq_usage
+        if usage is None:
+            return
+        
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None)
+        if cached_tokens is None:
+            cached_tokens = getattr(x_groq_usage, 'cached_tokens', 0) or 0
+        
+        print(f"📊 Prompt tokens: {usage.prompt_tokens} ({cached_tokens} cached by Groq)")
+    
+    
+    def _complete_json(self, **request) -> str:
+        """
+        Ask Groq for a JSON answer.
+        
+        JSON mode (response_format json_object) makes Groq return a bare JSON
+        object - no markdown fences or extra text to clean up. Groq doesn't
+        support streaming in JSON mode, so this is a normal request, and we
+        log the token usage from the response.
+        
+        Args:
+            **request: Arguments for chat.completions.create (model, messages, ...)
+        
+        Returns:
+            The response text (a JSON object)
+        """
+        response = self.client.chat.completions.create(
+            response_format={"type": "json_object"},
+            **request
+        )
+        self._log_token_usage(response)
+        return (response.choices[0].message.content or "").strip()
+    
+    
+    def _get_jd_cache(self, dimension: int) -> Dict:
+        """
+        Load the JD semantic cache from disk (only once per process).
+        
+        Args:
+            dimension: Embedding size, used when starting a fresh index
+        
+        Returns:
+            Dict with the FAISS 'index' and the parallel list of cached 'skills'
+        """
+        global _jd_cache
+        if _jd_cache is None:
+            import faiss
+            index, skills = None, []
+            try:
+                with open(JD_CACHE_SKILLS_PATH, 'rb') as f:
+                    saved = _json_loads(f.read())
+                if saved.get('version') == JD_CACHE_VERSION:
+                    index = faiss.read_index(JD_CACHE_INDEX_PATH)
+                    skills = saved['skills']
+            except Exception:
+                pass  # No cache saved yet (or it's broken) - start fresh
+            
+            if index is None or index.ntotal != len(skills):
+                index, skills = faiss.IndexFlatIP(dimension), []
+            _jd_cache = {'index': index, 'skills': skills}
+        return _jd_cache
+    
+    
+    def _embed_jd(self, jd_text: str):
+        """Embed a JD for the semantic cache (normalized, so inner product = cosine)."""
+        model = get_embedding_model()
+        return model.encode(jd_text[:1500], normalize_embeddings=True).astype('float32')
+    
+    
+    def _jd_cache_lookup(self, embedding) -> Optional[List[str]]:
+        """Return the skills of a cached JD that means nearly the same thing, if any."""
+        cache = self._get_jd_cache(embedding.shape[0])
+        if cache['index'].ntotal == 0:
+            return None
+        
+        scores, ids = cache['index'].search(embedding[None], 1)
+        if scores[0, 0] >= JD_SEMANTIC_THRESHOLD:
+            return cache['skills'][ids[0, 0]]
+        return None
+    
+    
+    def _jd_cache_add(self, embedding, skills: List[str]) -> None:
+        """Add a JD's skills to the semantic cache and save it to disk."""
+        import faiss
+        cache = self._get_jd_cache(embedding.shape[0])
+        cache['index'].add(embedding[None])
+        cache['skills'].append(skills)
+        try:
+            ensure_directory(os.path.dirname(JD_CACHE_INDEX_PATH))
+            faiss.write_index(cache['index'], JD_CACHE_INDEX_PATH)
+            with open(JD_CACHE_SKILLS_PATH, 'wb') as f:
+                f.write(_json_dumps({'version': JD_CACHE_VERSION, 'skills': cache['skills']}))
+        except Exception as e:
+            print(f"⚠️ Couldn't save JD skills cache: {e}")
+    
+    
     def extract_text(self, file_path: str) -> str:
         """
         Extract raw text from a resume file.
         
-        Supports PDF and plain text files. We use PyPDF2 to extract the text.
+        Supports PDF and plain text files. PDFs go through extract_text_from_pdf,
+        which caches the text of files it has already read.
         
         Args:
             file_path: Path to the resume file
@@ -99,7 +394,13 @@ class ResumeParser:
         return ""
     
     
-    def extract_name(self, text: str) -> str:
+    def clear_pdf_cache(self) -> None:
+        """Forget all cached PDF text (e.g. after changing the PDF backend)."""
+        clear_pdf_text_cache()
+        print("✅ PDF text cache cleared")
+    
+    
+    def extract_name(self, text: str, doc=None) -> str:
         """
         Figure out the candidate's name from their resume.
         We try multiple strategies:
@@ -110,6 +411,7 @@ class ResumeParser:
         
         Args:
             text: Full resume text
+            doc: spaCy doc of the first 1500 chars, if already processed (see parse_batch)
         
         Returns:
             Candidate's name, or "Unknown Candidate" if we can't figure it out
@@ -117,8 +419,9 @@ class ResumeParser:
         
         # Strategy 1: Use spaCy's Named Entity Recognition
         # This is trained to find person names in text
-        if self.nlp:
+        if doc is None and self.nlp:
             doc = self.nlp(text[:1500])  # Just check the first part
+        if doc is not None:
             for entity in doc.ents:
                 if entity.label_ == "PERSON":
                     name = entity.text.strip()
@@ -129,7 +432,8 @@ class ResumeParser:
         
         # Strategy 2: Look for name patterns at the top of the resume
         # Most people put their name in the first few lines
-        lines = text.split('\n')
+        # (maxsplit stops after 15 lines instead of splitting the whole resume)
+        lines = text.split('\n', 15)
         for line in lines[:15]:  # Check first 15 lines
             line = line.strip()
             
@@ -142,7 +446,7 @@ class ResumeParser:
                 continue
             
             # Skip lines with lots of numbers (probably phone/address)
-            if sum(char.isdigit() for char in line) > 3:
+            if _FOUR_DIGITS_RE.match(line):
                 continue
             
             # Skip common resume section headers
@@ -161,15 +465,12 @@ class ResumeParser:
         # Strategy 3: Ask AI to extract the name (last resort)
         if self.client:
             try:
-                prompt = f"""Extract the candidate's full name from this resume text. Return ONLY the name, nothing else.
-
-Resume excerpt:
-{text[:800]}
-
-Candidate name:"""
+                prompt = f"""Extract the candidate's full name from the resume excerpt below. Return ONLY the name, nothing else.
+---RESUME---
+{text[:800]}"""
                 
                 response = self.client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
+                    model=FAST_MODEL,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0.0,
                     max_tokens=50
@@ -178,7 +479,7 @@ Candidate name:"""
                 name = response.choices[0].message.content.strip()
                 
                 # Validate the AI's answer (make sure it's reasonable)
-                if name and '@' not in name and 3 < len(name) < 50 and len(name.split()) <= 4:
+                if self._is_valid_name(name):
                     return name
             except:
                 pass
@@ -199,10 +500,13 @@ Candidate name:"""
         Returns:
             Email address if found, None otherwise
         """
+        # No '@' means no email - a quick check before running the regex
+        if '@' not in text:
+            return None
+        
         # Standard email regex pattern
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(pattern, text)
-        return emails[0] if emails else None
+        match = _EMAIL_RE.search(text)
+        return match.group(0) if match else None
     
     
     def extract_phone(self, text: str) -> Optional[str]:
@@ -216,15 +520,10 @@ Candidate name:"""
             Phone number if found, None otherwise
         """
         # Try multiple phone number patterns
-        patterns = [
-            r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # US format
-            r'\+\d{10,15}'  # International format
-        ]
-        
-        for pattern in patterns:
-            phones = re.findall(pattern, text)
-            if phones:
-                return phones[0]
+        for pattern in _PHONE_RES:
+            match = pattern.search(text)
+            if match:
+                return match.group(0)
         
         return None
     
@@ -234,7 +533,8 @@ Candidate name:"""
         Extract education information from the resume.
         
         Looks for sentences that mention degrees, universities, etc.
-        Uses spaCy to understand sentence boundaries.
+        Sentences are split with a simple regex (punctuation or line breaks),
+        which is all this needs - no spaCy model required.
         
         Args:
             text: Full resume text
@@ -242,21 +542,18 @@ Candidate name:"""
         Returns:
             List of education-related sentences (max 3)
         """
-        # Common education keywords
-        keywords = ['bachelor', 'master', 'phd', 'degree', 'university']
-        
-        if self.nlp:
-            doc = self.nlp(text)
-            education = []
-            
-            # Find sentences that mention education
-            for sentence in doc.sents:
-                if any(keyword in sentence.text.lower() for keyword in keywords):
-                    education.append(sentence.text.strip())
-            
-            return education[:3]  # Return top 3 mentions
-        
-        return []
+        education = []
+        
+        # Find sentences that mention education (keywords are in _EDUCATION_RE)
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
+            if _EDUCATION_RE.search(sentence):
+                sentence = sentence.strip()
+                if sentence:
+                    education.append(sentence)
+                    if len(education) == 3:  # Return top 3 mentions
+                        break
+        
+        return education
     
     
     def extract_experience_years(self, text: str) -> int:
@@ -269,15 +566,14 @@ Candidate name:"""
         Returns:
             Number of years (0 if not mentioned)
         """
-        # Common patterns for mentioning experience
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'(\d+)\+?\s*years?\s+in',
-        ]
+        # Common patterns for mentioning experience (see _EXPERIENCE_RES)
+        lowered = text.lower()
+        if 'year' not in lowered:  # Every pattern needs "year"
+            return 0
         
         years_found = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text.lower())
+        for pattern in _EXPERIENCE_RES:
+            matches = pattern.findall(lowered)
             years_found.extend([int(year) for year in matches])
         
         # Return the highest number mentioned
@@ -300,40 +596,34 @@ Candidate name:"""
         
         print(f"🔍 Using AI to extract skills from resume...")
         
-        prompt = f"""Extract ALL technical skills from this resume.
-
-Resume:
-{text[:1500]}
-
-Return ONLY a JSON array of skills like: ["Python", "AWS", "Docker"]
-
-JSON Array:"""
+        prompt = f"""Extract ALL technical skills from the resume below.
+Return ONLY a JSON object like: {{"skills": ["Python", "AWS", "Docker"]}}
+---RESUME---
+{text[:1500]}"""
+        
+        cache_key = self._llm_cache_key(FAST_MODEL, prompt)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"✅ Found {len(cached)} skills (cached): {cached}")
+            return cached
         
         try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+            result = self._complete_json(
+                model=FAST_MODEL,
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.1,
-                max_tokens=300
+                max_tokens=270
             )
             
-            result = response.choices[0].message.content.strip()
-            
-            # Clean up the response
-            if '```json' in result:
-                result = result.split('```json')[1].split('```')[0]
-            elif '```' in result:
-                result = result.split('```')[1].split('```')[0]
-            
-            # JSON array
-            if '[' in result and ']' in result:
-                result = '[' + result.split('[', 1)[1]
-                result = result.split(']')[0] + ']'
-            
-            skills = json.loads(result.strip())
+            data = _json_loads(result)
+            skills = data.get('skills') if isinstance(data, dict) else None
             
             if isinstance(skills, list):
                 print(f"✅ Found {len(skills)} skills: {skills}")
+                self._llm_cache_put(cache_key, skills)
                 return skills
             
             return []
@@ -360,44 +650,53 @@ JSON Array:"""
             print("❌ Can't extract skills without Groq API")
             return []
         
-        prompt = f"""Extract ALL technical skills and requirements from this job description.
-
-Job Description:
-{jd_text[:1500]}
-
-Return ONLY a JSON array of technical skills: ["Python", "AWS", "Docker", "Machine Learning"]
+        prompt = f"""Extract ALL technical skills and requirements from the job description below.
+Return ONLY a JSON object with the technical skills: {{"skills": ["Python", "AWS", "Docker", "Machine Learning"]}}
 Include programming languages, frameworks, tools, technologies, and methodologies.
-
-JSON Array:"""
+---JOB DESCRIPTION---
+{jd_text[:1500]}"""
+        
+        cache_key = self._llm_cache_key(FAST_MODEL, prompt)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"✅ Found {len(cached)} required skills (cached): {cached}")
+            return cached
+        
+        # Not seen this exact JD - check for one that means nearly the same thing
+        try:
+            jd_embedding = self._embed_jd(jd_text)
+            similar = self._jd_cache_lookup(jd_embedding)
+        except Exception as e:
+            print(f"⚠️ JD semantic cache unavailable: {e}")
+            jd_embedding, similar = None, None
+        
+        if similar is not None:
+            print(f"✅ Found {len(similar)} required skills (from a similar JD): {similar}")
+            return similar
         
         try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+            result = self._complete_json(
+                model=FAST_MODEL,
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.1,
-                max_tokens=800
+                max_tokens=720
             )
-            
-            result = response.choices[0].message.content.strip()
             print(f"✅ AI responded: {result[:100]}...")
             
-            # Clean up
-            if '```json' in result:
-                result = result.split('```json')[1].split('```')[0]
-            elif '```' in result:
-                result = result.split('```')[1].split('```')[0]
-            
-            # Extract JSON array
-            if '[' in result and ']' in result:
-                result = '[' + result.split('[', 1)[1]
-                result = result.split(']')[0] + ']'
-            
-            skills = json.loads(result.strip())
+            data = _json_loads(result)
+            skills = data.get('skills') if isinstance(data, dict) else None
             
             if isinstance(skills, list) and skills:
-                # Remove duplicates and clean up
-                skills = list(set([skill.strip() for skill in skills if skill.strip()]))
+                # Remove duplicates and clean up (dict.fromkeys keeps the AI's order,
+                # so the same JD always gives the same list)
+                skills = list(dict.fromkeys(skill.strip() for skill in skills if skill.strip()))
                 print(f"✅ Found {len(skills)} required skills: {skills}")
+                self._llm_cache_put(cache_key, skills)
+                if jd_embedding is not None:
+                    self._jd_cache_add(jd_embedding, skills)
                 return skills
             
             print("⚠️ AI returned empty or invalid skills list")
@@ -411,7 +710,144 @@ JSON Array:"""
             return []
     
     
-    def parse(self, file_path: str) -> Optional[Dict]:
+    def parse_with_llm(self, text: str) -> Optional[Dict]:
+        """
+        Extract name, skills, education and experience with a single AI call.
+        
+        Asking for everything at once means the resume text is only sent (and
+        paid for) once, instead of once per field.
+        
+        Args:
+            text: Full resume text
+        
+        Returns:
+            Dict with name, skills, education and experience_years,
+            or None if the AI isn't available or its answer couldn't be used
+        """
+        if not self.client:
+            return None
+        
+        print(f"🔍 Using AI to extract candidate details from resume...")
+        
+        prompt = f"""Extract the candidate's details from the resume below.
+Return ONLY a JSON object like:
+{{"name": "Jane Smith", "skills": ["Python", "AWS", "Docker"], "education": ["BSc Computer Science, MIT"], "experience_years": 5}}
+
+- name: the candidate's full name
+- skills: ALL technical skills
+- education: degrees with their institutions
+- experience_years: total years of professional experience as a whole number (0 if unclear)
+---RESUME---
+{text[:3000]}"""
+        
+        cache_key = self._llm_cache_key(SMART_MODEL, prompt)
+        cached = self._llm_cache_get(cache_key)
+        if cached is not None:
+            print(f"✅ Got candidate details (cached): {cached['name']}")
+            return cached
+        
+        try:
+            result = self._complete_json(
+                model=SMART_MODEL,
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                max_tokens=540
+            )
+            
+            data = _json_loads(result)
+            
+            if not isinstance(data, dict):
+                return None
+            
+            # Make sure every field has the type the rest of the code expects
+            try:
+                experience_years = int(data.get('experience_years') or 0)
+            except (TypeError, ValueError):
+                experience_years = 0
+            
+            details = {
+                'name': str(data.get('name') or '').strip(),
+                'skills': [str(skill).strip() for skill in data.get('skills') or [] if str(skill).strip()],
+                'education': [str(item).strip() for item in data.get('education') or [] if str(item).strip()],
+                'experience_years': experience_years,
+            }
+            
+            print(f"✅ Got candidate details: {details['name']} ({len(details['skills'])} skills)")
+            self._llm_cache_put(cache_key, details)
+            return details
+            
+        except Exception as e:
+            print(f"⚠️ Combined extraction failed: {e}")
+            return None
+    
+    
+    def _is_valid_name(self, name: str) -> bool:
+        """Sanity-check a name from the AI (no emails, sensible length, 1-4 words)."""
+        return bool(name) and '@' not in name and 3 < len(name) < 50 and len(name.split()) <= 4
+    
+    
+    def _needs_nlp(self, details: Optional[Dict]) -> bool:
+        """Whether spaCy is needed to find the name (the AI didn't give us one)."""
+        return details is None or not self._is_valid_name(details['name'])
+    
+    
+    def _build_result(
+        self,
+        file_path: str,
+        text: str,
+        details: Optional[Dict],
+        doc=None,
+        keep_raw_text: bool = False
+    ) -> Dict:
+        """
+        Combine the AI's answer with the local extractors into the final result.
+        
+        Args:
+            file_path: Path to the resume file
+            text: Full resume text
+            details: Output of parse_with_llm (None if the AI call didn't work)
+            doc: spaCy doc of the first 1500 chars, if already processed (see parse_batch)
+            keep_raw_text: Include the (compressed) resume text (see parse)
+        
+        Returns:
+            The parsed resume (see parse)
+        """
+        if details is None:
+            # AI unavailable or failed - fall back to the per-field extractors
+            details = {
+                'name': self.extract_name(text, doc),
+                'skills': self.extract_skills_from_text(text),
+                'education': self.extract_education(text),
+                'experience_years': self.extract_experience_years(text),
+            }
+        else:
+            details = dict(details)  # Don't modify the cached copy
+            if not self._is_valid_name(details['name']):
+                details['name'] = self.extract_name(text, doc)
+            if not details['education']:
+                details['education'] = self.extract_education(text)
+            if not details['experience_years']:
+                details['experience_years'] = self.extract_experience_years(text)
+        
+        # Package everything up (email and phone are simple regex, no AI needed)
+        parsed = {
+            'filename': os.path.basename(file_path),
+            'name': details['name'],
+            'email': self.extract_email(text),
+            'phone': self.extract_phone(text),
+            'skills': details['skills'],
+            'education': details['education'],
+            'experience_years': details['experience_years'],
+        }
+        if keep_raw_text:
+            parsed['raw_text'] = _compress_text(text)
+        return parsed
+    
+    
+    def parse(self, file_path: str, keep_raw_text: bool = False) -> Optional[Dict]:
         """
         Main parsing function - extract all info from a resume file.
         
@@ -419,6 +855,9 @@ JSON Array:"""
         
         Args:
             file_path: Path to the resume PDF
+            keep_raw_text: Also return the full resume text. It's stored
+                compressed (resumes add up in a big batch) - read it with
+                get_raw_text(parsed).
         
         Returns:
             Dictionary with extracted information:
@@ -429,7 +868,7 @@ JSON Array:"""
                 - skills: List of technical skills
                 - education: Education background
                 - experience_years: Years of experience
-                - raw_text: Full extracted text
+                - raw_text: Compressed full text (only with keep_raw_text=True)
             
             Returns None if parsing fails
         """
@@ -441,21 +880,86 @@ JSON Array:"""
                 print(f"⚠️ No text found in {file_path} (might be a scanned image?)")
                 return None
             
-            # Extract skills using AI
-            skills = self.extract_skills_from_text(text)
+            # One AI call for name, skills, education and experience
+            details = self.parse_with_llm(text)
             
-            # Package everything up
-            return {
-                'filename': os.path.basename(file_path),
-                'name': self.extract_name(text),
-                'email': self.extract_email(text),
-                'phone': self.extract_phone(text),
-                'skills': skills,
-                'education': self.extract_education(text),
-                'experience_years': self.extract_experience_years(text),
-                'raw_text': text
-            }
+            return self._build_result(file_path, text, details, keep_raw_text=keep_raw_text)
             
         except Exception as e:
             print(f"❌ Failed to parse {file_path}: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    
+    def parse_batch(self, file_paths: List[str], keep_raw_text: bool = False) -> List[Optional[Dict]]:
+        """
+        Parse many resumes at once.
+        
+        Each resume needs its own Groq round-trips, so parsing them one after
+        another means waiting on the network N times. Here all the PDFs are
+        read first (in worker processes, see extract_texts_from_pdfs - the PDF
+        libraries aren't safe to share between threads), then up to
+        MAX_PARALLEL_PARSES resumes are sent to the AI at the same time, so
+        the AI part takes roughly as long as its slowest resume. Resumes that
+        still need spaCy (no usable name from the AI) are then run
+        through spaCy together with nlp.pipe, which is much faster than one
+        document at a time.
+        
+        Args:
+            file_paths: Paths to the resume files
+            keep_raw_text: Also return each resume's text (see parse)
+        
+        Returns:
+            Parsed resumes in the same order as file_paths (None where parsing failed)
+        """
+        if not file_paths:
+            return []
+        
+        # Step 1: get the text out of every file (PDFs all at once)
+        pdf_texts = extract_texts_from_pdfs([path for path in file_paths if path.endswith('.pdf')])
+        texts = []
+        for file_path in file_paths:
+            try:
+                text = pdf_texts[file_path] if file_path in pdf_texts else self.extract_text(file_path)
+            except Exception as e:
+                print(f"❌ Failed to parse {file_path}: {e}")
+                text = ""
+            else:
+                if not text.strip():
+                    print(f"⚠️ No text found in {file_path} (might be a scanned image?)")
+            texts.append(text)
+        
+        # Step 2: ask the AI about every resume at the same time (only network
+        # calls run on the threads)
+        def ask_llm(file_path, text):
+            if not text.strip():
+                return None
+            try:
+                return text, self.parse_with_llm(text)
+            except Exception as e:
+                print(f"❌ Failed to parse {file_path}: {e}")
+                return None
+        
+        workers = min(len(file_paths), MAX_PARALLEL_PARSES)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = list(executor.map(ask_llm, file_paths, texts))
+        
+        # Run spaCy over every resume that needs it in one batch
+        docs = {}
+        needs_nlp = [i for i, item in enumerate(fetched) if item and self._needs_nlp(item[1])]
+        if needs_nlp and self.nlp:
+            texts = [fetched[i][0][:1500] for i in needs_nlp]  # Names are near the top
+            docs = dict(zip(needs_nlp, self.nlp.pipe(texts, batch_size=32)))
+        
+        results = []
+        for i, (file_path, item) in enumerate(zip(file_paths, fetched)):
+            if item is None:
+                results.append(None)
+                continue
+            try:
+                text, details = item
+                results.append(self._build_result(file_path, text, details, docs.get(i), keep_raw_text))
+            except Exception as e:
+                print(f"❌ Failed to parse {file_path}: {e}")
+                results.append(None)
+        
+        return results
@@ -4,33 +4,684 @@ to any specific module such as PDF reading, text chunking,
 file handling, etc.
 """
 
-import PyPDF2
+import os
+import math
+import logging
+import hashlib
+import importlib
+import importlib.util
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Iterator, List, Tuple
 
+import numpy as np
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+
+# Messages go through logging, not print, so apps embedding these helpers pick
+# where (and whether) they show up. Nothing is printed unless the app
+# configures logging, e.g. logging.basicConfig(level=logging.INFO).
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+# Which library reads PDFs. PyMuPDF (MuPDF) and pypdfium2 (Google's PDFium) are
+# C/C++ engines, far faster than the pure-Python readers. If the chosen one
+# isn't installed we fall back through the others in PDF_BACKEND_ORDER.
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pymupdf")
+PDF_BACKEND_ORDER = ["pymupdf", "pypdfium2", "pypdf", "pypdf2"]
+
+# PDFs with more pages than this are extracted in parallel (pypdfium2 only)
+PARALLEL_PDF_MIN_PAGES = 4
+
+# Some pages (charts, vector art) have content streams of many MB but hardly
+# any text. Set SKIP_HUGE_PDF_STREAMS=1 to skip pages bigger than
+# HUGE_PDF_STREAM_BYTES instead of interpreting them (PyMuPDF only).
+SKIP_HUGE_PDF_STREAMS = os.environ.get("SKIP_HUGE_PDF_STREAMS", "0") == "1"
+HUGE_PDF_STREAM_BYTES = 5_000_000
+
+# If a PDF gives us less text than this, it's probably a scanned image - try OCR
+SCANNED_PDF_MIN_CHARS = 100
+
+# If the first SCANNED_SAMPLE_PAGES pages have fewer than SCANNED_SAMPLE_MIN_CHARS
+# characters between them and OCR is installed, we go straight to OCR instead
+# of reading the rest for text
+SCANNED_SAMPLE_PAGES = 2
+SCANNED_SAMPLE_MIN_CHARS = 50
+
+# Extracted PDF text is cached on disk, one .txt file per distinct PDF (by content).
+# Bump PDF_CACHE_VERSION whenever extraction output changes to drop old entries.
+# Entries not used for PDF_TEXT_CACHE_MAX_AGE seconds are deleted.
+PDF_TEXT_CACHE_DIR = os.path.expanduser("~/.cache/smarthr/pdf_text")
+PDF_CACHE_VERSION = "2"
+PDF_TEXT_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 30 days
+_PDF_CACHE_PRUNE_INTERVAL = 60 * 60  # Look for old entries at most once an hour
+_last_pdf_cache_prune = 0.0
+
+
+def _read_pdfium_pages(pdf, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from an open pypdfium2 document."""
+    texts = []
+    for index in range(start, stop):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        # PDFium uses Windows line endings; normalize to match the other backends
+        texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+        textpage.close()
+        page.close()
+    return texts
+
+
+def _pypdfium2_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Worker for the process pool: open the PDF and extract pages [start, stop)."""
+    import pypdfium2 as pdfium
+    
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return _read_pdfium_pages(pdf, start, stop)
+    finally:
+        pdf.close()
+
+
+def _pages_with_pypdfium2(pdf_path: str) -> Iterator[str]:
+    """
+    Yield the text of each page using pypdfium2.
+    
+    This reads PDFium's text layer directly, so drawing operators (lines, fills,
+    charts) that make up most of a graphics-heavy resume are never interpreted.
+    
+    Long PDFs (portfolios, multi-page CVs) are split into page ranges that are
+    extracted in parallel worker processes. Short ones are read right here,
+    since starting processes would cost more than it saves.
+    """
+    import pypdfium2 as pdfium
+    
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_count = len(pdf)
+        workers = min(page_count, os.cpu_count() or 1)
+        if page_count <= PARALLEL_PDF_MIN_PAGES or workers < 2:
+            yield from _read_pdfium_pages(pdf, 0, page_count)
+            return
+    finally:
+        pdf.close()
+    
+    step = math.ceil(page_count / workers)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+        for texts in executor.map(_pypdfium2_page_range, repeat(pdf_path), starts, stops):
+            yield from texts
+
+
+def _pages_with_pymupdf(pdf_path: str) -> Iterator[str]:
+    """
+    Yield the text of each page using PyMuPDF.
+    
+    Plain "text" mode only collects characters - images and drawings are never
+    extracted. Ligatures are expanded (so "ﬁ" comes out as "fi") to keep skill
+    matching working.
+    """
+    import pymupdf
+    
+    flags = pymupdf.TEXT_PRESERVE_WHITESPACE | pymupdf.TEXT_MEDIABOX_CLIP | pymupdf.TEXT_CID_FOR_UNKNOWN_UNICODE
+    
+    doc = pymupdf.open(pdf_path)
+    try:
+        for page in doc:
+            if SKIP_HUGE_PDF_STREAMS:
+                stream_size = len(page.read_contents())
+                if stream_size > HUGE_PDF_STREAM_BYTES:
+                    logger.info("Skipping page %d of %s (%.1f MB of drawing data)",
+                                page.number + 1, pdf_path, stream_size / 1_000_000)
+                    yield ""
+                    continue
+            yield page.get_text("text", flags=flags)
+    finally:
+        doc.close()
+
+
+def _pages_with_pypdf(pdf_path: str) -> Iterator[str]:
+    """Yield the text of each page using pypdf (PyPDF2's successor)."""
+    import pypdf
+    
+    with open(pdf_path, 'rb') as file:
+        for page in pypdf.PdfReader(file).pages:
+            yield page.extract_text()
+
+
+def _pages_with_pypdf2(pdf_path: str) -> Iterator[str]:
+    """Yield the text of each page using PyPDF2."""
+    import PyPDF2
+    
+    with open(pdf_path, 'rb') as file:
+        for page in PyPDF2.PdfReader(file).pages:
+            yield page.extract_text()
+
+
+def _ocr_pdf(pdf_path: str) -> str:
+    """
+    Read a scanned PDF with OCR (Tesseract). Each page is rendered to an image
+    with pypdfium2 and passed to pytesseract.
+    
+    Returns:
+        The OCR'd text, or empty string if pytesseract/pypdfium2 aren't installed
+    """
+    try:
+        import pytesseract
+        import pypdfium2 as pdfium
+    except ImportError:
+        logger.info("%s looks like a scanned PDF - install pytesseract to read it with OCR", pdf_path)
+        return ""
+    
+    logger.info("%s looks like a scanned PDF - running OCR...", pdf_path)
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            texts = []
+            for page in pdf:
+                image = page.render(scale=300 / 72).to_pil()  # 300 DPI
+                texts.append(pytesseract.image_to_string(image))
+                page.close()
+            return "\n".join(texts).strip()
+        finally:
+            pdf.close()
+    except Exception as e:  # e.g. the tesseract program itself isn't installed
+        logger.warning("OCR failed for %s: %s", pdf_path, e)
+        return ""
+
+
+@lru_cache(maxsize=1)
+def _ocr_available() -> bool:
+    """True if the OCR libraries (pytesseract and pypdfium2) are installed."""
+    return all(importlib.util.find_spec(name) is not None for name in ("pytesseract", "pypdfium2"))
+
+
+def _read_pdf_text(pdf_path: str, stop_if_scanned: bool):
+    """
+    Read the text layer of every page and join it into one string.
+    
+    Args:
+        pdf_path: Full path to the PDF file
+        stop_if_scanned: Give up after the first SCANNED_SAMPLE_PAGES pages if
+            they have (almost) no text
+    
+    Returns:
+        (text, stopped_early)
+    """
+    # Collect the pages and join once - adding to one big string copies it
+    # again for every page
+    parts = []
+    sample_chars = 0
+    for page_number, page_text in enumerate(_pdf_page_reader()(pdf_path)):
+        if (stop_if_scanned and page_number == SCANNED_SAMPLE_PAGES
+                and sample_chars < SCANNED_SAMPLE_MIN_CHARS):
+            logger.info("%s looks like a scanned PDF - not reading the remaining pages", pdf_path)
+            return "\n".join(parts).strip(), True
+        if page_text:  # Some pages might be blank
+            parts.append(page_text)
+            sample_chars += len(page_text.strip())
+    return "\n".join(parts).strip(), False
+
+
+# backend name -> (module it needs, page reader)
+_PDF_BACKENDS = {
+    "pymupdf": ("pymupdf", _pages_with_pymupdf),
+    "pypdfium2": ("pypdfium2", _pages_with_pypdfium2),
+    "pypdf": ("pypdf", _pages_with_pypdf),
+    "pypdf2": ("PyPDF2", _pages_with_pypdf2),
+}
+
+
+def _pdf_page_reader(backend: str = None):
+    """
+    Pick the page reader for the configured backend, falling back to whichever
+    other backend is installed.
+    """
+    backend = (backend or PDF_BACKEND).lower()
+    candidates = [backend] + [name for name in PDF_BACKEND_ORDER if name != backend]
+    
+    for name in candidates:
+        if name not in _PDF_BACKENDS:
+            continue
+        module_name, read_pages = _PDF_BACKENDS[name]
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            continue
+        return read_pages
+    
+    raise ImportError("No PDF library found - install pypdfium2 (or pypdf / PyPDF2)")
+
+
+# Directories we've already created (or found) this run - see ensure_directory
+_ensured_dirs = set()
+
+
+def ensure_directory(directory: str) -> None:
+    """
+    Make sure a directory exists, creating it (and its parents) if needed.
+    
+    Each directory is only checked on disk the first time, so cache writes
+    that happen for every resume don't pay for a mkdir call each time.
+    
+    Args:
+        directory: Path of the directory
+    """
+    if directory in _ensured_dirs:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _ensured_dirs.add(directory)
+
+
+def _pdf_cache_key(pdf_path: str) -> str:
+    """
+    Cache key for a PDF: a hash of the file's bytes plus the PDF settings and
+    PDF_CACHE_VERSION. The same resume uploaded again (even under another
+    name) hits the cache; a changed file or changed settings don't.
+    """
+    digest = hashlib.sha256(f"{PDF_CACHE_VERSION}|{PDF_BACKEND}|{SKIP_HUGE_PDF_STREAMS}|".encode('utf-8'))
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pdf_cache_file(pdf_path: str) -> str:
+    """Where the cached text for this version of the PDF lives."""
+    return os.path.join(PDF_TEXT_CACHE_DIR, f"{_pdf_cache_key(pdf_path)}.txt")
+
+
+def _read_pdf_text_cache(cache_file: str):
+    """Return the cached text, or None on a miss."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        os.utime(cache_file)  # Mark as recently used, so it isn't pruned
+        return text
+    except OSError:
+        return None
+
+
+def _prune_pdf_text_cache() -> None:
+    """Delete cached PDF text that hasn't been used for PDF_TEXT_CACHE_MAX_AGE."""
+    global _last_pdf_cache_prune
+    now = time.time()
+    if now - _last_pdf_cache_prune < _PDF_CACHE_PRUNE_INTERVAL:
+        return
+    _last_pdf_cache_prune = now
+    
+    try:
+        entries = list(os.scandir(PDF_TEXT_CACHE_DIR))
+    except OSError:
+        return  # No cache yet
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime > PDF_TEXT_CACHE_MAX_AGE:
+                os.remove(entry.path)
+        except OSError:
+            pass  # Already gone (another process pruned it)
+
+
+def _write_pdf_text_cache(cache_file: str, text: str) -> None:
+    """Save extracted text (written to a temp file first so readers never see half of it)."""
+    try:
+        ensure_directory(PDF_TEXT_CACHE_DIR)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.info("Couldn't save to PDF text cache: %s", e)
+    _prune_pdf_text_cache()
+
+
+def clear_pdf_text_cache() -> None:
+    """Delete all cached PDF text, so every PDF is read again next time."""
+    try:
+        cache_files = os.listdir(PDF_TEXT_CACHE_DIR)
+    except OSError:
+        return  # No cache yet
+    for name in cache_files:
+        try:
+            os.remove(os.path.join(PDF_TEXT_CACHE_DIR, name))
+        except OSError as e:
+            logger.info("Couldn't delete cached PDF text %s: %s", name, e)
+
+
+def extract_text_from_pdf(pdf_path: str, use_cache: bool = True) -> str:
     """
-    Pull text content out of a PDF file. This uses PyPDF2 to read each page and combine all the text.
+    Pull text content out of a PDF file. This reads each page (with PyMuPDF by
+    default, see PDF_BACKEND) and combines all the text. Scanned PDFs with no
+    real text layer fall back to OCR when pytesseract is installed.
+    
+    Results are cached in PDF_TEXT_CACHE_DIR by file contents, so the same
+    PDF is never parsed twice - even when it's uploaded again under a new name.
     
     Args:
         pdf_path: Full path to the PDF file
+        use_cache: Set to False to always re-read the PDF
     
     Returns:
         All text from the PDF as one big string, or empty string if it fails
     """
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Go through each page and extract text
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:  # Some pages might be blank
-                    text += page_text + "\n"
+        cache_file = None
+        if use_cache:
+            cache_file = _pdf_cache_file(pdf_path)
+            cached = _read_pdf_text_cache(cache_file)
+            if cached is not None:
+                return cached
+        
+        # Scanned PDFs have no text layer at all - if the first pages are
+        # empty and OCR can read them, skip straight to OCR instead of reading
+        # every page (without OCR, blank first pages are probably just a cover)
+        text, stopped_early = _read_pdf_text(pdf_path, stop_if_scanned=_ocr_available())
+        
+        # Hardly any text usually means the pages are images (scanned resume)
+        if len(text) < SCANNED_PDF_MIN_CHARS:
+            ocr_text = _ocr_pdf(pdf_path)
+            if len(ocr_text) > len(text):
+                text = ocr_text
+            elif stopped_early:
+                # OCR found nothing either - read the pages we skipped after all
+                text, _ = _read_pdf_text(pdf_path, stop_if_scanned=False)
+        
+        # Don't cache failures - an empty result might be fixed by installing OCR
+        if cache_file and text:
+            _write_pdf_text_cache(cache_file, text)
+        
+        return text
+        
+    except Exception as e:
+        logger.warning("Couldn't read %s: %s (this might be a scanned PDF or corrupted file)", pdf_path, e)
+        return ""
+
+
+def extract_texts_from_pdfs(pdf_paths: List[str], workers: int = None) -> Dict[str, str]:
+    """
+    Pull text out of many PDF files at once, spread over worker processes.
+    
+    PDF parsing is CPU-bound, so spreading files across processes scales with
+    the number of cores. Use this instead of calling extract_text_from_pdf in
+    a loop whenever there's more than one PDF to read.
+    
+    Files already in the text cache are answered right here, so the workers
+    only start if something actually needs parsing (and more than one process
+    would help). Each worker gets files in
+    small batches rather than one at a time, which matters for lots of
+    short resumes where the per-file handoff costs as much as the parsing.
+    (Processes rather than threads: PyMuPDF isn't safe to use across threads.)
+    
+    Args:
+        pdf_paths: Full paths to the PDF files
+        workers: How many processes to use (default: one per core, at most one per file)
+    
+    Returns:
+        Dict mapping each path to its text (empty string for files that failed),
+        in the same order as pdf_paths
+    """
+    texts = {}
+    to_read = []
+    for path in dict.fromkeys(pdf_paths):  # Each file once, even if listed twice
+        try:
+            cached = _read_pdf_text_cache(_pdf_cache_file(path))
+        except OSError:
+            cached = None  # Missing file - let extract_text_from_pdf report it
+        if cached is None:
+            to_read.append(path)
+        else:
+            texts[path] = cached
+    
+    workers = workers or min(len(to_read), os.cpu_count() or 1)
+    if len(to_read) <= 1 or workers <= 1:
+        # A single process gains nothing from a pool - read them right here
+        for path in to_read:
+            texts[path] = extract_text_from_pdf(path)
+    else:
+        # A few batches per worker, so one huge file doesn't hold up the rest
+        batch_size = max(1, len(to_read) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(extract_text_from_pdf, to_read, chunksize=batch_size)
+            texts.update(zip(to_read, results))
+    
+    return {path: texts[path] for path in pdf_paths}
+
+
+# Lookup table: True for every character str.split() treats as whitespace.
+# The highest such character is U+3000, so the table stops just past it.
+_IS_WHITESPACE = np.array([chr(c).isspace() for c in range(0x3002)])
+_IS_WHITESPACE_ASCII = _IS_WHITESPACE[:256].copy()
+
+
+def _word_spans(text: str):
+    """
+    Find the (start, end) character offsets of every word in the text, using
+    the same word boundaries as str.split(). Done with NumPy on the whole
+    string at once instead of one word at a time.
+    """
+    # One array slot per character so positions line up with the string
+    if text.isascii():
+        codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        is_word = ~_IS_WHITESPACE_ASCII[codes]
+    else:
+        codes = np.frombuffer(text.encode('utf-32-le', errors='surrogatepass'), dtype=np.uint32)
+        is_word = ~_IS_WHITESPACE[np.minimum(codes, len(_IS_WHITESPACE) - 1)]
+    
+    # Pad with "not a word" on both sides, then a word starts wherever
+    # whitespace turns into text and ends wherever text turns back
+    padded = np.zeros(len(is_word) + 2, dtype=bool)
+    padded[1:-1] = is_word
+    starts = np.flatnonzero(padded[1:] & ~padded[:-1])
+    ends = np.flatnonzero(padded[:-1] & ~padded[1:])
+    return starts, ends
+
+
+# chunk_text remembers its results for this many (document, settings) pairs
+CHUNK_CACHE_SIZE = 128
+
+# In adaptive mode, the overlap may grow by at most this share of chunk_size
+# to make the chunks fit the text exactly (see chunk_text)
+ADAPTIVE_MAX_EXTRA_OVERLAP = 0.1
+_chunk_cache = OrderedDict()
+_chunk_cache_lock = threading.Lock()
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50,
+               adaptive: bool = False) -> List[str]:
+    """
+    Break long documents into overlapping chunks of words.
+    
+    We find where every word starts and ends once, then cut each chunk
+    straight out of the original text - no re-joining lists of words.
+    Results for the last CHUNK_CACHE_SIZE documents are remembered, so
+    re-indexing unchanged policies skips the work entirely.
+    
+    With adaptive=True we avoid a tiny last chunk that costs an embedding but
+    adds almost nothing. If stretching the overlap by at most
+    ADAPTIVE_MAX_EXTRA_OVERLAP of chunk_size makes the chunks fit the text
+    exactly, every chunk is full size. Otherwise the normal stride is kept,
+    and a last chunk shorter than chunk_size // 2 is merged into the one
+    before it (dropping it would lose the document's last words).
+    
+    Args:
+        text: The full document text
+        chunk_size: How many words per chunk
+        overlap: How many words to repeat between chunks (the minimum, if adaptive)
+        adaptive: Avoid a tiny last chunk (see above)
+    
+    Returns:
+        List of text chunks, like pages in a book (empty if the text is blank)
+    """
+    key = (hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest(),
+           chunk_size, overlap, adaptive)
+    with _chunk_cache_lock:
+        chunks = _chunk_cache.get(key)
+        if chunks is not None:
+            _chunk_cache.move_to_end(key)
+            return list(chunks)  # A copy, so callers can't change the cached list
+    
+    chunks = _chunk_text(text, chunk_size, overlap, adaptive)
+    
+    with _chunk_cache_lock:
+        _chunk_cache[key] = chunks
+        if len(_chunk_cache) > CHUNK_CACHE_SIZE:
+            _chunk_cache.popitem(last=False)  # Forget the least recently used
+    return list(chunks)
+
+
+def _chunk_text(text: str, chunk_size: int, overlap: int, adaptive: bool) -> List[str]:
+    """The actual chunking behind chunk_text (no caching)."""
+    starts, ends = _word_spans(text)
+    
+    # Blank document - nothing worth embedding
+    if not len(starts):
+        return []
+    
+    # Slide through the text with overlapping windows
+    n_words = len(starts)
+    stride = chunk_size - overlap
+    if adaptive and n_words > chunk_size:
+        # How many chunks the normal stride needs to reach the last word
+        n_chunks = math.ceil((n_words - chunk_size) / stride) + 1
+        # The overlap that would make that many full-size chunks fit exactly
+        stretched = math.ceil((n_chunks * chunk_size - n_words) / (n_chunks - 1))
+        if stretched - overlap <= ADAPTIVE_MAX_EXTRA_OVERLAP * chunk_size:
+            first_words = np.linspace(0, n_words - chunk_size, n_chunks).round().astype(np.int64)
+            last_words = first_words + chunk_size - 1
+        else:
+            first_words = np.arange(n_chunks) * stride
+            last_words = np.minimum(first_words + chunk_size - 1, n_words - 1)
+            if n_words - first_words[-1] < chunk_size // 2:
+                # Fold the short tail into the previous chunk
+                first_words = first_words[:-1]
+                last_words = last_words[:-1]
+                last_words[-1] = n_words - 1
+    elif adaptive:
+        first_words = np.array([0])
+        last_words = np.array([n_words - 1])
+    else:
+        first_words = np.arange(0, n_words, stride)
+        last_words = np.minimum(first_words + chunk_size - 1, n_words - 1)
+    return [
+        text[start:end]
+        for start, end in zip(starts[first_words].tolist(), ends[last_words].tolist())
+    ]
+
+
+def chunk_id(chunk: str) -> bytes:
+    """16-byte content hash of a chunk - identical chunks get identical ids."""
+    return hashlib.blake2b(chunk.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+
+
+def chunk_text_with_ids(text: str, chunk_size: int = 500, overlap: int = 50,
+                        adaptive: bool = False) -> List[Tuple[bytes, str]]:
+    """
+    Same as chunk_text, but each chunk comes with its chunk_id.
+    
+    Identical chunks (boilerplate headers, repeated clauses) get identical ids,
+    even across documents, so callers can embed each distinct chunk only once:
+    dict(chunk_text_with_ids(text)) keeps one entry per distinct chunk.
+    
+    Args:
+        text: The full document text
+        chunk_size: How many words per chunk
+        overlap: How many words to repeat between chunks
+        adaptive: See chunk_text
+    
+    Returns:
+        List of (id, chunk) pairs, in document order
+    """
+    return [(chunk_id(chunk), chunk) for chunk in chunk_text(text, chunk_size, overlap, adaptive)]
+
+
+def iter_pdf_chunks(pdf_path: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[str]:
+    """
+    Read a PDF page by page and hand out chunks as soon as they're ready,
+    instead of building the whole document's text first.
+    
+    Only the text of the chunk being built is kept in memory, so this is
+    the way to go for very long PDFs - and the caller can start embedding
+    the first chunks while later pages are still being read.
+    
+    Gives exactly the same chunks as chunk_text(extract_text_from_pdf(pdf_path))
+    (original whitespace kept, pages joined by a newline) whenever OCR isn't
+    used. It doesn't use the text cache or the OCR fallback, so scanned PDFs
+    yield no useful chunks.
+    
+    Args:
+        pdf_path: Full path to the PDF file
+        chunk_size: How many words per chunk
+        overlap: How many words to repeat between chunks
+    
+    Yields:
+        Text chunks, in document order
+    """
+    step = chunk_size - overlap
+    text = ""     # Document text from the first word of the current chunk on
+    base = 0      # Where `text` starts within the whole document
+    spans = deque()  # (start, end) of each word in `text`, in document positions
+    
+    def take_chunk():
+        chunk = text[spans[0][0] - base:spans[min(chunk_size, len(spans)) - 1][1] - base]
+        for _ in range(min(step, len(spans))):
+            spans.popleft()
+        return chunk
+    
+    try:
+        for page_text in _pdf_page_reader()(pdf_path):
+            if not page_text:  # Some pages might be blank
+                continue
+            if text or base:
+                text += "\n"  # Same page separator as extract_text_from_pdf
+            offset = base + len(text)
+            starts, ends = _word_spans(page_text)
+            spans.extend(zip((starts + offset).tolist(), (ends + offset).tolist()))
+            text += page_text
             
-            return text.strip()
+            # Hand out every full chunk we have, keeping the overlap for the next one
+            while len(spans) >= chunk_size:
+                yield take_chunk()
             
+            # Forget the text before the next chunk's first word
+            cut = (spans[0][0] if spans else base + len(text)) - base
+            text = text[cut:]
+            base += cut
     except Exception as e:
-        print(f"❌ Couldn't read {pdf_path}: {e}")
-        print(f"   (This might be a scanned PDF or corrupted file)")
-        return ""
+        logger.warning("Couldn't read %s: %s", pdf_path, e)
+        return
+    
+    # Whatever's left at the end of the document
+    while spans:
+        yield take_chunk()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model():
+    """
+    Load the Sentence-BERT model used for semantic matching.
+    
+    The model is loaded once per process and shared by everything that needs it
+    (policy chatbot, recruitment engine), so Streamlit reruns don't load the
+    ~90MB of weights again. Sharing is safe because encoding is stateless.
+    
+    Before loading, torch is told to use half the CPU cores for encoding, since
+    many deployments (Streamlit, Docker) default to a single thread. Set
+    RECRUITER_PIN_THREADS=0 to leave torch's thread settings alone.
+    
+    Returns:
+        The 'all-MiniLM-L6-v2' SentenceTransformer
+    """
+    if os.environ.get("RECRUITER_PIN_THREADS", "1") == "1":
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2))
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            pass  # Can only be set once, before any parallel work has started
+    
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')